@@ -4,362 +4,467 @@ Diagnostic script for offline storage database debugging.
 Inspects the SQLite database to understand the actual state of downloads.
 """
 
+import functools
 import sqlite3
 import json
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
 DB_PATH = Path(__file__).parent.parent / ".jamra-data" / "catalog.sqlite"
 
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+STATUS_EMOJI = {
+    'queued': '⏳',
+    'downloading': '⬇️',
+    'completed': '✅',
+    'failed': '❌'
+}
+
+# Section-5 issue checks, run concurrently on per-thread connections.
+DUPLICATE_QUEUE_SQL = """
+    SELECT
+        dq.id as queue_id,
+        dq.chapter_id,
+        dq.chapter_number,
+        dq.status as queue_status,
+        dq.manga_slug
+    FROM download_queue dq
+    WHERE dq.chapter_id IS NOT NULL
+        AND EXISTS (
+            SELECT 1
+            FROM offline_manga om
+            JOIN offline_chapters oc ON oc.offline_manga_id = om.id
+            WHERE om.extension_id = dq.extension_id
+                AND om.manga_id = dq.manga_id
+                AND oc.chapter_id = dq.chapter_id
+        )
+"""
+
+FROZEN_SQL = """
+    SELECT
+        id, manga_slug, chapter_number, started_at,
+        (? - started_at) / 60000.0 as minutes_elapsed
+    FROM download_queue
+    WHERE status = 'downloading'
+        AND started_at IS NOT NULL
+        AND started_at < ?
+"""
+
+ZERO_PAGES_SQL = """
+    SELECT
+        om.manga_slug,
+        oc.chapter_id,
+        oc.chapter_number,
+        oc.total_pages
+    FROM offline_chapters oc
+    JOIN offline_manga om ON oc.offline_manga_id = om.id
+    WHERE oc.total_pages IS NULL OR oc.total_pages = 0
+"""
+
 def connect_db():
-    """Connect to the SQLite database."""
+    """Connect to the SQLite database in read-only mode with tuned pragmas."""
     if not DB_PATH.exists():
         print(f"❌ Database not found at: {DB_PATH}")
         sys.exit(1)
-    return sqlite3.connect(str(DB_PATH))
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    # This script only reads; query_only guards against accidental writes,
+    # and the memory/mmap pragmas cut syscalls on large fetches.
+    for pragma in ("query_only=ON", "temp_store=MEMORY", "mmap_size=268435456", "cache_size=-65536"):
+        conn.execute(f"PRAGMA {pragma}")
+    return conn
+
+def ensure_indexes():
+    """Create the indexes the diagnostic queries rely on (no-op after first run).
+
+    Uses a short-lived read-write connection since connect_db opens read-only.
+    Also runs PRAGMA optimize here so the planner has fresh sqlite_stat1
+    entries; it cannot run on the query_only diagnostic connections.
+    """
+    # Opening a missing database read-write would create an empty file as a
+    # side effect; leave the missing-DB error path to connect_db.
+    if not DB_PATH.exists():
+        return
+    conn = sqlite3.connect(str(DB_PATH))
+    try:
+        for ddl in (
+            "CREATE INDEX IF NOT EXISTS idx_om_ext_mid ON offline_manga(extension_id, manga_id)",
+            "CREATE INDEX IF NOT EXISTS idx_oc_om_cid ON offline_chapters(offline_manga_id, chapter_id)",
+            "CREATE INDEX IF NOT EXISTS idx_oc_om_num ON offline_chapters(offline_manga_id, chapter_number)",
+            "CREATE INDEX IF NOT EXISTS idx_dq_status ON download_queue(status)",
+            "CREATE INDEX IF NOT EXISTS idx_dq_prio_queued ON download_queue(priority DESC, queued_at ASC)",
+            # Partial index over only the anomalous rows, so the zero-page
+            # check scans a near-empty index instead of every chapter.
+            "CREATE INDEX IF NOT EXISTS idx_oc_zero ON offline_chapters(offline_manga_id)"
+            " WHERE total_pages IS NULL OR total_pages = 0",
+        ):
+            conn.execute(ddl)
+        conn.commit()
+        # Cheap after the first call: only re-analyzes tables whose
+        # statistics have gone stale.
+        conn.execute("PRAGMA optimize")
+    except sqlite3.OperationalError:
+        # Database may be locked by the app or on read-only media; the
+        # queries still run without the indexes, just slower.
+        pass
+    finally:
+        conn.close()
+
+def run_check(sql, params=()):
+    """Run one issue-check query on its own connection.
+
+    sqlite3 connections cannot be shared across threads, so each worker
+    opens (and closes) a private read-only connection.
+    """
+    conn = connect_db()
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+def emit(lines):
+    """Flush a section's buffered lines with a single stdout write."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def fmt_bytes(n):
+    """Format a byte count with thousands separators."""
+    return f"{n:,d} bytes"
 
+@functools.lru_cache(maxsize=4096)
 def format_timestamp(ts):
-    """Convert Unix timestamp (ms) to readable format."""
+    """Convert Unix timestamp (ms) to readable format (memoized per value)."""
     if ts is None:
         return "N/A"
     try:
-        return datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S")
-    except:
+        return datetime.fromtimestamp(ts / 1000).strftime(_TS_FORMAT)
+    except (TypeError, ValueError, OSError, OverflowError):
         return str(ts)
 
 def inspect_database():
     """Inspect the offline storage database."""
+    ensure_indexes()
     conn = connect_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
-    print("="*80)
-    print("OFFLINE STORAGE DATABASE INSPECTION")
-    print("="*80)
-    print()
-
-    # Check if tables exist
-    cursor.execute("""
-        SELECT name FROM sqlite_master
-        WHERE type='table' AND name LIKE 'offline%' OR name LIKE 'download%'
-        ORDER BY name
-    """)
-    tables = cursor.fetchall()
-
-    if not tables:
-        print("❌ No offline storage tables found!")
+    # One deferred read transaction: a single shared lock and a stable
+    # snapshot across every statement below.
+    cursor.execute("BEGIN")
+    try:
+        emit(["="*80, "OFFLINE STORAGE DATABASE INSPECTION", "="*80, ""])
+
+        # Check if tables exist
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND (name LIKE 'offline%' OR name LIKE 'download%')
+            ORDER BY name
+        """)
+        tables = cursor.fetchall()
+
+        if not tables:
+            print("❌ No offline storage tables found!")
+            return
+
+        lines = ["📋 Available tables:"]
+        for table in tables:
+            lines.append(f"   - {table['name']}")
+        lines.append("")
+        emit(lines)
+
+        # Gather the statistics up front (printed as section 4) so the
+        # later sections can skip their queries when a table is empty.
+        cursor.execute("SELECT status, COUNT(*) as count FROM download_queue GROUP BY status")
+        status_counts = {row['status']: row['count'] for row in cursor.fetchall()}
+        queued_count = status_counts.get('queued', 0)
+        downloading_count = status_counts.get('downloading', 0)
+        failed_count = status_counts.get('failed', 0)
+        queue_count = sum(status_counts.values())
+
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM offline_manga) as manga_count,
+                (SELECT COUNT(*) FROM offline_chapters) as chapter_count,
+                (SELECT COALESCE(SUM(total_size_bytes), 0) FROM offline_manga) as total_size
+        """)
+        stats = cursor.fetchone()
+        manga_count = stats['manga_count']
+        chapter_count = stats['chapter_count']
+        total_size = stats['total_size']
+
+        # 1. OFFLINE MANGA
+        # The pre-computed counts double as an existence check, so the
+        # section SELECTs (and their sorts) never run against empty tables.
+        lines = ["="*80, "1. OFFLINE MANGA", "="*80]
+        if manga_count:
+            cursor.execute("""
+                SELECT id, extension_id, manga_id, manga_slug,
+                       downloaded_at, last_updated_at, total_size_bytes
+                FROM offline_manga
+                ORDER BY downloaded_at DESC
+            """)
+            # Iterate the cursor directly so rows buffer as SQLite produces
+            # them instead of materializing the whole result set first.
+            for manga in cursor:
+                lines.append(f"\n   Manga ID: {manga['id']}")
+                lines.append(f"   Extension: {manga['extension_id']}")
+                lines.append(f"   Manga ID: {manga['manga_id']}")
+                lines.append(f"   Slug: {manga['manga_slug']}")
+                lines.append(f"   Downloaded: {format_timestamp(manga['downloaded_at'])}")
+                lines.append(f"   Last Updated: {format_timestamp(manga['last_updated_at'])}")
+                lines.append(f"   Size: {fmt_bytes(manga['total_size_bytes'])}")
+        else:
+            lines.append("   No manga downloaded")
+
+        lines.append("")
+        emit(lines)
+
+        # 2. OFFLINE CHAPTERS
+        lines = ["="*80, "2. OFFLINE CHAPTERS", "="*80]
+        if chapter_count:
+            # MATERIALIZED pins the join + window pass to a single scan,
+            # with idx_oc_om_num feeding the per-manga chapter order.
+            cursor.execute("""
+                WITH chapters_view AS MATERIALIZED (
+                    SELECT
+                        om.manga_slug,
+                        oc.chapter_id,
+                        oc.chapter_number,
+                        oc.chapter_title,
+                        oc.total_pages,
+                        oc.downloaded_at,
+                        oc.size_bytes,
+                        ROW_NUMBER() OVER (PARTITION BY om.id ORDER BY oc.chapter_number) AS rn
+                    FROM offline_chapters oc
+                    JOIN offline_manga om ON oc.offline_manga_id = om.id
+                )
+                SELECT * FROM chapters_view
+                ORDER BY manga_slug, chapter_number
+            """)
+            # rn == 1 marks the first chapter of each manga, so the group
+            # headers come from SQL and the output goes out in one write.
+            for chapter in cursor:
+                if chapter['rn'] == 1:
+                    lines.append(f"\n   📖 {chapter['manga_slug']}")
+
+                lines.append(f"      Ch {chapter['chapter_number']}: {chapter['chapter_title'] or 'Untitled'}")
+                lines.append(f"         ID: {chapter['chapter_id']}")
+                lines.append(f"         Pages: {chapter['total_pages']}")
+                lines.append(f"         Size: {fmt_bytes(chapter['size_bytes'])}")
+                lines.append(f"         Downloaded: {format_timestamp(chapter['downloaded_at'])}")
+        else:
+            lines.append("   No chapters downloaded")
+
+        lines.append("")
+        emit(lines)
+
+        # 3. DOWNLOAD QUEUE
+        lines = ["="*80, "3. DOWNLOAD QUEUE (Active/Pending)", "="*80]
+        if queue_count:
+            cursor.execute("""
+                SELECT
+                    id, extension_id, manga_slug, chapter_id, chapter_number, chapter_title,
+                    status, priority, queued_at, started_at, completed_at, error_message,
+                    progress_current, progress_total
+                FROM download_queue
+                ORDER BY priority DESC, queued_at ASC
+            """)
+            for item in cursor:
+                status_emoji = STATUS_EMOJI.get(item['status'], '❓')
+
+                lines.append(f"\n   {status_emoji} Queue ID: {item['id']} | Status: {item['status'].upper()}")
+                lines.append(f"      Manga: {item['manga_slug']}")
+
+                if item['chapter_id']:
+                    lines.append(f"      Chapter: Ch {item['chapter_number']} - {item['chapter_title'] or 'Untitled'}")
+                    lines.append(f"      Chapter ID: {item['chapter_id']}")
+                else:
+                    lines.append(f"      Type: FULL MANGA DOWNLOAD")
+
+                lines.append(f"      Priority: {item['priority']}")
+                lines.append(f"      Queued: {format_timestamp(item['queued_at'])}")
+
+                if item['started_at']:
+                    lines.append(f"      Started: {format_timestamp(item['started_at'])}")
+
+                if item['status'] == 'downloading':
+                    progress_pct = 0
+                    if item['progress_total'] and item['progress_total'] > 0:
+                        progress_pct = (item['progress_current'] / item['progress_total']) * 100
+                    lines.append(f"      Progress: {item['progress_current']}/{item['progress_total']} ({progress_pct:.1f}%)")
+
+                if item['error_message']:
+                    lines.append(f"      ❌ Error: {item['error_message']}")
+        else:
+            lines.append("   Queue is empty")
+
+        lines.append("")
+        emit(lines)
+
+        # 4. STATISTICS (gathered up front)
+        emit([
+            "="*80,
+            "4. STATISTICS",
+            "="*80,
+            f"\n   Downloaded Manga: {manga_count}",
+            f"   Downloaded Chapters: {chapter_count}",
+            f"   Total Size: {fmt_bytes(total_size)} ({total_size / (1024*1024):.2f} MB)",
+            f"   Queue - Queued: {queued_count}",
+            f"   Queue - Downloading: {downloading_count}",
+            f"   Queue - Failed: {failed_count}",
+            "",
+        ])
+
+        # 5. POTENTIAL ISSUES
+        emit(["="*80, "5. POTENTIAL ISSUES DETECTION", "="*80, ""])
+
+        # The three checks are independent reads, so run them concurrently
+        # on separate connections. The empty-table guards from the stats
+        # still apply: a check that cannot find anything is never submitted.
+        duplicate_future = frozen_future = zero_pages_future = None
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            # A duplicate needs both a downloaded chapter and a queue entry.
+            # EXISTS makes this a semi-join: two index seeks per queue row,
+            # stopping at the first hit.
+            if chapter_count and queue_count:
+                duplicate_future = pool.submit(run_check, DUPLICATE_QUEUE_SQL)
+
+            # Frozen downloads (stuck in 'downloading' for > 1 hour).
+            # Bind "now" once from Python so SQLite compares against a
+            # constant instead of calling strftime per row.
+            if downloading_count:
+                now_ms = int(time.time() * 1000)
+                frozen_future = pool.submit(run_check, FROZEN_SQL, (now_ms, now_ms - 3600000))
+
+            # Chapters with 0 pages.
+            if chapter_count:
+                zero_pages_future = pool.submit(run_check, ZERO_PAGES_SQL)
+
+        duplicate_queue = duplicate_future.result() if duplicate_future else []
+        frozen = frozen_future.result() if frozen_future else []
+        zero_pages = zero_pages_future.result() if zero_pages_future else []
+
+        lines = []
+        if duplicate_queue:
+            lines.append("   ⚠️  CHAPTERS IN QUEUE THAT ARE ALREADY DOWNLOADED:")
+            for dup in duplicate_queue:
+                lines.append(f"      - Queue ID {dup['queue_id']}: {dup['manga_slug']} Ch {dup['chapter_number']}")
+                lines.append(f"        Chapter ID: {dup['chapter_id']}")
+                lines.append(f"        Queue Status: {dup['queue_status']}")
+        else:
+            lines.append("   ✅ No chapters in queue that are already downloaded")
+        lines.append("")
+        emit(lines)
+
+        lines = []
+        if frozen:
+            lines.append("   ⚠️  FROZEN DOWNLOADS (stuck in 'downloading' for > 1 hour):")
+            for item in frozen:
+                lines.append(f"      - Queue ID {item['id']}: {item['manga_slug']} Ch {item['chapter_number']}")
+                lines.append(f"        Stuck for: {item['minutes_elapsed']:.1f} minutes")
+        else:
+            lines.append("   ✅ No frozen downloads detected")
+        lines.append("")
+        emit(lines)
+
+        lines = []
+        if zero_pages:
+            lines.append("   ⚠️  CHAPTERS WITH ZERO PAGES (possibly corrupted):")
+            for item in zero_pages:
+                lines.append(f"      - {item['manga_slug']} Ch {item['chapter_number']}")
+                lines.append(f"        Chapter ID: {item['chapter_id']}")
+        else:
+            lines.append("   ✅ All downloaded chapters have pages")
+        lines.append("")
+        lines.append("="*80)
+        emit(lines)
+
+    finally:
+        cursor.execute("COMMIT")
         conn.close()
-        return
-
-    print("📋 Available tables:")
-    for table in tables:
-        print(f"   - {table['name']}")
-    print()
-
-    # 1. OFFLINE MANGA
-    print("="*80)
-    print("1. OFFLINE MANGA")
-    print("="*80)
-    cursor.execute("""
-        SELECT id, extension_id, manga_id, manga_slug,
-               downloaded_at, last_updated_at, total_size_bytes
-        FROM offline_manga
-        ORDER BY downloaded_at DESC
-    """)
-    manga_list = cursor.fetchall()
-
-    if not manga_list:
-        print("   No manga downloaded")
-    else:
-        for manga in manga_list:
-            print(f"\n   Manga ID: {manga['id']}")
-            print(f"   Extension: {manga['extension_id']}")
-            print(f"   Manga ID: {manga['manga_id']}")
-            print(f"   Slug: {manga['manga_slug']}")
-            print(f"   Downloaded: {format_timestamp(manga['downloaded_at'])}")
-            print(f"   Last Updated: {format_timestamp(manga['last_updated_at'])}")
-            print(f"   Size: {manga['total_size_bytes']:,} bytes")
-
-    print()
-
-    # 2. OFFLINE CHAPTERS
-    print("="*80)
-    print("2. OFFLINE CHAPTERS")
-    print("="*80)
-
-    cursor.execute("""
-        SELECT
-            oc.id,
-            om.manga_slug,
-            oc.chapter_id,
-            oc.chapter_number,
-            oc.chapter_title,
-            oc.total_pages,
-            oc.downloaded_at,
-            oc.size_bytes
-        FROM offline_chapters oc
-        JOIN offline_manga om ON oc.offline_manga_id = om.id
-        ORDER BY om.manga_slug, oc.chapter_number
-    """)
-    chapters = cursor.fetchall()
-
-    if not chapters:
-        print("   No chapters downloaded")
-    else:
-        current_manga = None
-        for chapter in chapters:
-            if current_manga != chapter['manga_slug']:
-                current_manga = chapter['manga_slug']
-                print(f"\n   📖 {current_manga}")
-
-            print(f"      Ch {chapter['chapter_number']}: {chapter['chapter_title'] or 'Untitled'}")
-            print(f"         ID: {chapter['chapter_id']}")
-            print(f"         Pages: {chapter['total_pages']}")
-            print(f"         Size: {chapter['size_bytes']:,} bytes")
-            print(f"         Downloaded: {format_timestamp(chapter['downloaded_at'])}")
-
-    print()
-
-    # 3. DOWNLOAD QUEUE
-    print("="*80)
-    print("3. DOWNLOAD QUEUE (Active/Pending)")
-    print("="*80)
-
-    cursor.execute("""
-        SELECT
-            id, extension_id, manga_slug, chapter_id, chapter_number, chapter_title,
-            status, priority, queued_at, started_at, completed_at, error_message,
-            progress_current, progress_total
-        FROM download_queue
-        ORDER BY priority DESC, queued_at ASC
-    """)
-    queue = cursor.fetchall()
-
-    if not queue:
-        print("   Queue is empty")
-    else:
-        for item in queue:
-            status_emoji = {
-                'queued': '⏳',
-                'downloading': '⬇️',
-                'completed': '✅',
-                'failed': '❌'
-            }.get(item['status'], '❓')
-
-            print(f"\n   {status_emoji} Queue ID: {item['id']} | Status: {item['status'].upper()}")
-            print(f"      Manga: {item['manga_slug']}")
-
-            if item['chapter_id']:
-                print(f"      Chapter: Ch {item['chapter_number']} - {item['chapter_title'] or 'Untitled'}")
-                print(f"      Chapter ID: {item['chapter_id']}")
-            else:
-                print(f"      Type: FULL MANGA DOWNLOAD")
-
-            print(f"      Priority: {item['priority']}")
-            print(f"      Queued: {format_timestamp(item['queued_at'])}")
-
-            if item['started_at']:
-                print(f"      Started: {format_timestamp(item['started_at'])}")
-
-            if item['status'] == 'downloading':
-                progress_pct = 0
-                if item['progress_total'] and item['progress_total'] > 0:
-                    progress_pct = (item['progress_current'] / item['progress_total']) * 100
-                print(f"      Progress: {item['progress_current']}/{item['progress_total']} ({progress_pct:.1f}%)")
-
-            if item['error_message']:
-                print(f"      ❌ Error: {item['error_message']}")
-
-    print()
-
-    # 4. STATISTICS
-    print("="*80)
-    print("4. STATISTICS")
-    print("="*80)
-
-    cursor.execute("SELECT COUNT(*) as count FROM offline_manga")
-    manga_count = cursor.fetchone()['count']
-
-    cursor.execute("SELECT COUNT(*) as count FROM offline_chapters")
-    chapter_count = cursor.fetchone()['count']
-
-    cursor.execute("SELECT COUNT(*) as count FROM download_queue WHERE status = 'queued'")
-    queued_count = cursor.fetchone()['count']
-
-    cursor.execute("SELECT COUNT(*) as count FROM download_queue WHERE status = 'downloading'")
-    downloading_count = cursor.fetchone()['count']
-
-    cursor.execute("SELECT COUNT(*) as count FROM download_queue WHERE status = 'failed'")
-    failed_count = cursor.fetchone()['count']
-
-    cursor.execute("SELECT SUM(total_size_bytes) as size FROM offline_manga")
-    total_size = cursor.fetchone()['size'] or 0
-
-    print(f"\n   Downloaded Manga: {manga_count}")
-    print(f"   Downloaded Chapters: {chapter_count}")
-    print(f"   Total Size: {total_size:,} bytes ({total_size / (1024*1024):.2f} MB)")
-    print(f"   Queue - Queued: {queued_count}")
-    print(f"   Queue - Downloading: {downloading_count}")
-    print(f"   Queue - Failed: {failed_count}")
-
-    print()
-
-    # 5. POTENTIAL ISSUES
-    print("="*80)
-    print("5. POTENTIAL ISSUES DETECTION")
-    print("="*80)
-    print()
-
-    # Check for chapters in queue that are already downloaded
-    cursor.execute("""
-        SELECT
-            dq.id as queue_id,
-            dq.chapter_id,
-            dq.chapter_number,
-            dq.status as queue_status,
-            om.manga_slug
-        FROM download_queue dq
-        JOIN offline_manga om ON dq.extension_id = om.extension_id
-            AND dq.manga_id = om.manga_id
-        JOIN offline_chapters oc ON oc.offline_manga_id = om.id
-            AND oc.chapter_id = dq.chapter_id
-        WHERE dq.chapter_id IS NOT NULL
-    """)
-    duplicate_queue = cursor.fetchall()
-
-    if duplicate_queue:
-        print("   ⚠️  CHAPTERS IN QUEUE THAT ARE ALREADY DOWNLOADED:")
-        for dup in duplicate_queue:
-            print(f"      - Queue ID {dup['queue_id']}: {dup['manga_slug']} Ch {dup['chapter_number']}")
-            print(f"        Chapter ID: {dup['chapter_id']}")
-            print(f"        Queue Status: {dup['queue_status']}")
-    else:
-        print("   ✅ No chapters in queue that are already downloaded")
-
-    print()
-
-    # Check for frozen downloads (downloading for > 1 hour)
-    cursor.execute("""
-        SELECT
-            id, manga_slug, chapter_number, started_at,
-            (strftime('%s', 'now') * 1000 - started_at) / 1000 / 60 as minutes_elapsed
-        FROM download_queue
-        WHERE status = 'downloading'
-            AND started_at IS NOT NULL
-            AND (strftime('%s', 'now') * 1000 - started_at) > 3600000
-    """)
-    frozen = cursor.fetchall()
-
-    if frozen:
-        print("   ⚠️  FROZEN DOWNLOADS (stuck in 'downloading' for > 1 hour):")
-        for item in frozen:
-            print(f"      - Queue ID {item['id']}: {item['manga_slug']} Ch {item['chapter_number']}")
-            print(f"        Stuck for: {item['minutes_elapsed']:.1f} minutes")
-    else:
-        print("   ✅ No frozen downloads detected")
-
-    print()
-
-    # Check for chapters with 0 pages
-    cursor.execute("""
-        SELECT
-            om.manga_slug,
-            oc.chapter_id,
-            oc.chapter_number,
-            oc.total_pages
-        FROM offline_chapters oc
-        JOIN offline_manga om ON oc.offline_manga_id = om.id
-        WHERE oc.total_pages = 0 OR oc.total_pages IS NULL
-    """)
-    zero_pages = cursor.fetchall()
-
-    if zero_pages:
-        print("   ⚠️  CHAPTERS WITH ZERO PAGES (possibly corrupted):")
-        for item in zero_pages:
-            print(f"      - {item['manga_slug']} Ch {item['chapter_number']}")
-            print(f"        Chapter ID: {item['chapter_id']}")
-    else:
-        print("   ✅ All downloaded chapters have pages")
-
-    print()
-    print("="*80)
-
-    conn.close()
 
 def check_specific_manga(manga_id, extension_id="com.weebcentral.manga"):
     """Check specific manga for issues."""
+    ensure_indexes()
     conn = connect_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
-    print("="*80)
-    print(f"SPECIFIC MANGA CHECK: {manga_id}")
-    print("="*80)
-    print()
-
-    # Get manga info
-    cursor.execute("""
-        SELECT * FROM offline_manga
-        WHERE extension_id = ? AND manga_id = ?
-    """, (extension_id, manga_id))
-
-    manga = cursor.fetchone()
-
-    if not manga:
-        print(f"❌ Manga {manga_id} not found in offline_manga table")
-        print("   This manga has no downloaded chapters.")
+    # One deferred read transaction: a single shared lock and a stable
+    # snapshot across every statement below.
+    cursor.execute("BEGIN")
+    try:
+        print("="*80)
+        print(f"SPECIFIC MANGA CHECK: {manga_id}")
+        print("="*80)
+        print()
+
+        # Get manga info. Projecting only the printed columns lets the
+        # (extension_id, manga_id) index satisfy the lookup without pulling
+        # the full row payload; the parameterized text also hits sqlite3's
+        # per-connection statement cache on repeat invocations.
+        cursor.execute("""
+            SELECT id, manga_slug, total_size_bytes FROM offline_manga
+            WHERE extension_id = ? AND manga_id = ?
+        """, (extension_id, manga_id))
+
+        manga = cursor.fetchone()
+
+        if not manga:
+            print(f"❌ Manga {manga_id} not found in offline_manga table")
+            print("   This manga has no downloaded chapters.")
+            return
+
+        print(f"✅ Manga found in database:")
+        print(f"   DB ID: {manga['id']}")
+        print(f"   Slug: {manga['manga_slug']}")
+        print(f"   Total Size: {fmt_bytes(manga['total_size_bytes'])}")
+        print()
+
+        # Get downloaded chapters
+        cursor.execute("""
+            SELECT chapter_id, chapter_number, chapter_title, total_pages
+            FROM offline_chapters
+            WHERE offline_manga_id = ?
+            ORDER BY chapter_number
+        """, (manga['id'],))
+
+        chapters = cursor.fetchall()
+
+        print(f"Downloaded Chapters: {len(chapters)}")
+        if chapters:
+            for ch in chapters:
+                print(f"   - Ch {ch['chapter_number']}: {ch['chapter_title'] or 'Untitled'} ({ch['total_pages']} pages)")
+                print(f"     ID: {ch['chapter_id']}")
+
+        print()
+
+        # Get queue items for this manga
+        cursor.execute("""
+            SELECT chapter_id, chapter_number, status, error_message
+            FROM download_queue
+            WHERE extension_id = ? AND manga_id = ?
+            ORDER BY priority DESC, queued_at ASC
+        """, (extension_id, manga_id))
+
+        queue_items = cursor.fetchall()
+
+        print(f"Queue Items: {len(queue_items)}")
+        if queue_items:
+            for item in queue_items:
+                status_emoji = STATUS_EMOJI.get(item['status'], '❓')
+
+                chapter_info = f"Ch {item['chapter_number']}" if item['chapter_id'] else "FULL MANGA"
+                print(f"   {status_emoji} {chapter_info}: {item['status']}")
+                if item['error_message']:
+                    print(f"      Error: {item['error_message']}")
+
+    finally:
+        cursor.execute("COMMIT")
         conn.close()
-        return
-
-    print(f"✅ Manga found in database:")
-    print(f"   DB ID: {manga['id']}")
-    print(f"   Slug: {manga['manga_slug']}")
-    print(f"   Total Size: {manga['total_size_bytes']:,} bytes")
-    print()
-
-    # Get downloaded chapters
-    cursor.execute("""
-        SELECT * FROM offline_chapters
-        WHERE offline_manga_id = ?
-        ORDER BY chapter_number
-    """, (manga['id'],))
-
-    chapters = cursor.fetchall()
-
-    print(f"Downloaded Chapters: {len(chapters)}")
-    if chapters:
-        for ch in chapters:
-            print(f"   - Ch {ch['chapter_number']}: {ch['chapter_title'] or 'Untitled'} ({ch['total_pages']} pages)")
-            print(f"     ID: {ch['chapter_id']}")
-
-    print()
-
-    # Get queue items for this manga
-    cursor.execute("""
-        SELECT * FROM download_queue
-        WHERE extension_id = ? AND manga_id = ?
-        ORDER BY priority DESC, queued_at ASC
-    """, (extension_id, manga_id))
-
-    queue_items = cursor.fetchall()
-
-    print(f"Queue Items: {len(queue_items)}")
-    if queue_items:
-        for item in queue_items:
-            status_emoji = {
-                'queued': '⏳',
-                'downloading': '⬇️',
-                'completed': '✅',
-                'failed': '❌'
-            }.get(item['status'], '❓')
-
-            chapter_info = f"Ch {item['chapter_number']}" if item['chapter_id'] else "FULL MANGA"
-            print(f"   {status_emoji} {chapter_info}: {item['status']}")
-            if item['error_message']:
-                print(f"      Error: {item['error_message']}")
-
-    conn.close()
 
 if __name__ == "__main__":
     if len(sys.argv) > 1: